@@ -4,6 +4,7 @@ from .models import Well, SurveyImport, Trajectory, TrajectoryStation, BoreholeG
 class TrajectoryStationInline(admin.TabularInline):
     model = TrajectoryStation
     extra = 0
+    fields = ('md', 'inclination', 'azimuth', 'tvd', 'north', 'east', 'dls')
     readonly_fields = ('tvd', 'north', 'east', 'dls')
     can_delete = False
     ordering = ('md',)
@@ -11,6 +12,10 @@ class TrajectoryStationInline(admin.TabularInline):
     def has_add_permission(self, request, obj=None):
         return False
 
+    def get_queryset(self, request):
+        # Evitar cargar el JSON de atributos por cada estación
+        return super().get_queryset(request).only('trajectory', *self.fields)
+
 class BoreholeGeometryInline(admin.TabularInline):
     model = BoreholeGeometry
     extra = 0
@@ -24,6 +29,7 @@ class WellAdmin(admin.ModelAdmin):
 @admin.register(SurveyImport)
 class SurveyImportAdmin(admin.ModelAdmin):
     list_display = ('well', 'uploaded_by', 'status', 'created_at')
+    list_select_related = ('well', 'uploaded_by')
     list_filter = ('status', 'created_at')
     search_fields = ('well__name',)
     readonly_fields = ('processing_log',)
@@ -31,6 +37,11 @@ class SurveyImportAdmin(admin.ModelAdmin):
 @admin.register(Trajectory)
 class TrajectoryAdmin(admin.ModelAdmin):
     list_display = ('name', 'well', 'trajectory_type', 'is_active', 'created_at')
+    list_select_related = ('well',)
     list_filter = ('well', 'trajectory_type', 'is_active')
     search_fields = ('name', 'well__name')
     inlines = [BoreholeGeometryInline, TrajectoryStationInline]
+
+    def get_queryset(self, request):
+        # Los arrays y mallas precalculados no se muestran: evitar leer y decodificar ese JSON
+        return super().get_queryset(request).defer('computed_arrays', 'render_cache')
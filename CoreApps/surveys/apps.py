@@ -4,3 +4,6 @@ class SurveysConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'CoreApps.surveys'
     verbose_name = 'Gestión de Surveys y Pozos'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -2,20 +2,24 @@ from django.shortcuts import get_object_or_404, redirect
 from django.views.generic import View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from .models import Trajectory
+from django.db import transaction
+from .models import Trajectory, SurveyImport
 
 class TrajectoryDeleteView(LoginRequiredMixin, View):
     def post(self, request, pk):
-        trajectory = get_object_or_404(Trajectory, pk=pk)
-        well_id = trajectory.well.id
+        # Solo las columnas necesarias (sin los JSON computed_arrays / render_cache)
+        trajectory = get_object_or_404(Trajectory.objects.only('well', 'source_import'), pk=pk)
+        well_id = trajectory.well_id
+        source_import_id = trajectory.source_import_id
         
-        # Eliminar también la importación asociada si existe
-        if trajectory.source_import:
-            trajectory.source_import.delete() # Esto elimina la trayectoria en cascada si está configurado, pero por seguridad...
-        
-        # Si no se ha borrado por cascada, borrar manualmente
-        if Trajectory.objects.filter(pk=pk).exists():
+        with transaction.atomic():
+            # Borrar primero la trayectoria (cascada a estaciones y geometría).
+            # source_import es SET_NULL: borrar antes la importación no la eliminaría.
             trajectory.delete()
             
+            # Eliminar también la importación asociada si existe
+            if source_import_id:
+                SurveyImport.objects.filter(pk=source_import_id).delete()
+            
         messages.success(request, "Trayectoria eliminada correctamente.")
         return redirect('surveys:well_detail', pk=well_id)
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-15 10:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0004_trajectory_grid_convergence_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='surveyimport',
+            index=models.Index(fields=['well', '-created_at'], name='surveys_sur_well_id_d0d42e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trajectory',
+            index=models.Index(fields=['well', 'is_active'], name='surveys_tra_well_id_a4c2f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='boreholegeometry',
+            index=models.Index(fields=['trajectory', 'start_md'], name='surveys_bor_traject_3b853d_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-15 11:40
+
+from django.db import migrations, models
+
+
+def backfill_computed_arrays(apps, schema_editor):
+    Trajectory = apps.get_model('surveys', 'Trajectory')
+    TrajectoryStation = apps.get_model('surveys', 'TrajectoryStation')
+    fields = ('md', 'tvd', 'north', 'east')
+    for trajectory in Trajectory.objects.only('pk').iterator():
+        rows = list(TrajectoryStation.objects.filter(trajectory=trajectory).order_by('md').values_list(*fields))
+        if rows:
+            trajectory.computed_arrays = {field: list(col) for field, col in zip(fields, zip(*rows))}
+            trajectory.save(update_fields=['computed_arrays'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0005_surveyimport_surveys_sur_well_id_d0d42e_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trajectory',
+            name='computed_arrays',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Arrays Calculados'),
+        ),
+        migrations.RunPython(backfill_computed_arrays, migrations.RunPython.noop),
+    ]
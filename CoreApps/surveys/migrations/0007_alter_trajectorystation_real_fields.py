@@ -0,0 +1,49 @@
+# Generated by Django 4.2 on 2026-10-15 12:25
+
+import CoreApps.surveys.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0006_trajectory_computed_arrays'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='azimuth',
+            field=CoreApps.surveys.models.RealField(help_text='Azimuth', verbose_name='Azi (deg)'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='dls',
+            field=CoreApps.surveys.models.RealField(blank=True, help_text='Dogleg Severity', null=True, verbose_name='DLS'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='east',
+            field=CoreApps.surveys.models.RealField(blank=True, help_text='Desplazamiento Este', null=True, verbose_name='Este (m)'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='inclination',
+            field=CoreApps.surveys.models.RealField(help_text='Inclinación', verbose_name='Inc (deg)'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='md',
+            field=CoreApps.surveys.models.RealField(help_text='Measured Depth', verbose_name='MD (m)'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='north',
+            field=CoreApps.surveys.models.RealField(blank=True, help_text='Desplazamiento Norte', null=True, verbose_name='Norte (m)'),
+        ),
+        migrations.AlterField(
+            model_name='trajectorystation',
+            name='tvd',
+            field=CoreApps.surveys.models.RealField(blank=True, help_text='True Vertical Depth', null=True, verbose_name='TVD (m)'),
+        ),
+    ]
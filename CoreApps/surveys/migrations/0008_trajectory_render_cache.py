@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-15 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('surveys', '0007_alter_trajectorystation_real_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trajectory',
+            name='render_cache',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Caché de Renderizado 3D'),
+        ),
+    ]
@@ -3,6 +3,18 @@ from django.db import models
 from django.conf import settings
 from django.utils.translation import gettext_lazy as _
 
+class RealField(models.FloatField):
+    """
+    FloatField de precisión simple (float4 / 'real' en Postgres).
+    La precisión de un survey MWD (~3 cifras significativas) no necesita float8
+    y así la tabla de estaciones ocupa la mitad. En otros motores se comporta
+    como un FloatField normal.
+    """
+    def db_type(self, connection):
+        if connection.vendor == 'postgresql':
+            return 'real'
+        return super().db_type(connection)
+
 class Well(models.Model):
     """
     Modelo que representa un Pozo Petrolero.
@@ -50,6 +62,9 @@ class SurveyImport(models.Model):
         verbose_name = _("Importación de Survey")
         verbose_name_plural = _("Importaciones")
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['well', '-created_at']),
+        ]
 
     def __str__(self):
         return f"{self.well.name} - {self.created_at.strftime('%Y-%m-%d %H:%M')}"
@@ -77,14 +92,41 @@ class Trajectory(models.Model):
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Copia desnormalizada de las estaciones en arrays paralelos (md, tvd, north, east)
+    # para la visualización: una sola fila en lugar de N estaciones.
+    computed_arrays = models.JSONField(_("Arrays Calculados"), default=dict, blank=True, editable=False)
+    # Mallas 3D precalculadas en la importación (ver visualizer.build_render_data)
+    render_cache = models.JSONField(_("Caché de Renderizado 3D"), default=dict, blank=True, editable=False)
+
+    STATION_ARRAY_FIELDS = ('md', 'tvd', 'north', 'east')
+
     class Meta:
         verbose_name = _("Trayectoria")
         verbose_name_plural = _("Trayectorias")
         unique_together = ['well', 'name'] # Evitar nombres duplicados en el mismo pozo
+        indexes = [
+            models.Index(fields=['well', 'is_active']),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_trajectory_type_display()})"
 
+    def get_station_arrays(self):
+        """
+        Retorna dict de listas paralelas (md, tvd, north, east) ordenadas por MD.
+        Si no hay copia desnormalizada (importaciones antiguas o estaciones editadas),
+        la arma desde las estaciones y la persiste para las próximas lecturas.
+        """
+        if self.computed_arrays:
+            return self.computed_arrays
+        rows = list(self.stations.order_by('md').values_list(*self.STATION_ARRAY_FIELDS))
+        if not rows:
+            return {field: [] for field in self.STATION_ARRAY_FIELDS}
+        arrays = {field: list(col) for field, col in zip(self.STATION_ARRAY_FIELDS, zip(*rows))}
+        Trajectory.objects.filter(pk=self.pk).update(computed_arrays=arrays)
+        self.computed_arrays = arrays
+        return arrays
+
 class TrajectoryStation(models.Model):
     """
     Punto individual de medición (Estación).
@@ -93,15 +135,15 @@ class TrajectoryStation(models.Model):
     trajectory = models.ForeignKey(Trajectory, on_delete=models.CASCADE, related_name='stations')
     
     # Input Data (Leído del Excel)
-    md = models.FloatField(_("MD (m)"), help_text="Measured Depth")
-    inclination = models.FloatField(_("Inc (deg)"), help_text="Inclinación")
-    azimuth = models.FloatField(_("Azi (deg)"), help_text="Azimuth")
+    md = RealField(_("MD (m)"), help_text="Measured Depth")
+    inclination = RealField(_("Inc (deg)"), help_text="Inclinación")
+    azimuth = RealField(_("Azi (deg)"), help_text="Azimuth")
 
     # Calculated Data (Minimum Curvature)
-    tvd = models.FloatField(_("TVD (m)"), null=True, blank=True, help_text="True Vertical Depth")
-    north = models.FloatField(_("Norte (m)"), null=True, blank=True, help_text="Desplazamiento Norte")
-    east = models.FloatField(_("Este (m)"), null=True, blank=True, help_text="Desplazamiento Este")
-    dls = models.FloatField(_("DLS"), null=True, blank=True, help_text="Dogleg Severity")
+    tvd = RealField(_("TVD (m)"), null=True, blank=True, help_text="True Vertical Depth")
+    north = RealField(_("Norte (m)"), null=True, blank=True, help_text="Desplazamiento Norte")
+    east = RealField(_("Este (m)"), null=True, blank=True, help_text="Desplazamiento Este")
+    dls = RealField(_("DLS"), null=True, blank=True, help_text="Dogleg Severity")
 
     # Atributos Mecánicos / Flexibles para Mapa de Calor
     # Guardamos como JSON para flexibilidad futura (Fricción, Tortuosidad, etc)
@@ -135,6 +177,9 @@ class BoreholeGeometry(models.Model):
         verbose_name = _("Geometría del Pozo")
         verbose_name_plural = _("Geometría del Pozo")
         ordering = ['start_md']
+        indexes = [
+            models.Index(fields=['trajectory', 'start_md']),
+        ]
 
     def __str__(self):
         return f"{self.item_type} ({self.start_md}-{self.end_md}m)"
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import Trajectory, TrajectoryStation, BoreholeGeometry
+from .visualizer import plot_cache_key
+
+# Trajectory no tiene receptor de post_delete a propósito: el borrado en cascada (desde Well)
+# cargaría cada trayectoria completa (JSON incluidos). El HTML de una trayectoria borrada no se
+# vuelve a servir porque la clave incluye created_at, y expira solo (PLOT_CACHE_TIMEOUT).
+
+def _invalidate_plot_cache(trajectory):
+    # Tras el commit: una visita intermedia leería los datos viejos y los volvería a cachear
+    key = plot_cache_key(trajectory)
+    transaction.on_commit(lambda: cache.delete(key))
+
+# El título del gráfico usa trajectory.name: renombrar desde el admin debe invalidar el HTML
+@receiver(post_save, sender=Trajectory)
+def invalidate_plot_on_trajectory_save(sender, instance, **kwargs):
+    _invalidate_plot_cache(instance)
+
+def _reset_trajectory_render(trajectory_id, **cleared):
+    """
+    Vacía los datos precalculados indicados y el HTML cacheado;
+    generate_3d_plot los vuelve a armar en la próxima visita.
+    """
+    Trajectory.objects.filter(pk=trajectory_id).update(**cleared)
+    trajectory = Trajectory.objects.filter(pk=trajectory_id).only('created_at').first()
+    if trajectory:
+        _invalidate_plot_cache(trajectory)
+
+# Ediciones desde el admin (inlines) cambian el gráfico.
+# Estaciones: solo post_save, un post_delete desactivaría el borrado rápido en cascada.
+@receiver(post_save, sender=TrajectoryStation)
+def invalidate_arrays_on_station_change(sender, instance, **kwargs):
+    _reset_trajectory_render(instance.trajectory_id, computed_arrays={}, render_cache={})
+
+@receiver(post_save, sender=BoreholeGeometry)
+@receiver(post_delete, sender=BoreholeGeometry)
+def invalidate_plot_on_geometry_change(sender, instance, **kwargs):
+    # Borrado en cascada (desde Trajectory/Well): la trayectoria también se elimina, no hay nada que invalidar
+    if 'origin' in kwargs and kwargs['origin'] is not instance:
+        return
+    _reset_trajectory_render(instance.trajectory_id, render_cache={})
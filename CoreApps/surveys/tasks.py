@@ -0,0 +1,26 @@
+from celery import shared_task
+from .models import SurveyImport
+from .utils import process_survey_file
+
+@shared_task
+def process_survey_file_task(import_id):
+    """
+    Procesa una importación en segundo plano (fuera del request HTTP).
+    El estado queda en SurveyImport.status para que la vista lo consulte.
+    """
+    try:
+        survey_import = SurveyImport.objects.select_related('well').get(pk=import_id)
+    except SurveyImport.DoesNotExist:
+        # Importación eliminada antes de que el worker la tomara
+        return False
+    
+    # Con acks tardíos el mensaje puede reentregarse: no volver a procesar una importación ya resuelta
+    if survey_import.status != SurveyImport.Status.PENDING:
+        return survey_import.status == SurveyImport.Status.PROCESSED
+    
+    success = process_survey_file(survey_import, survey_import.excel_file.path)
+    
+    if success:
+        # Marcar como activa la trayectoria generada (UPDATE directo, sin fetch)
+        survey_import.generated_trajectories.update(is_active=True)
+    return success
@@ -0,0 +1,72 @@
+import numpy as np
+from django.test import SimpleTestCase
+from .utils import minimum_curvature, compute_trajectory
+from .visualizer import get_path_segment
+
+def scalar_trajectory(md, inc, azi):
+    """
+    Referencia: recorre el survey estación por estación con minimum_curvature,
+    partiendo del origen en superficie (0, 0, 0).
+    """
+    tvd, north, east, dls = [], [], [], []
+    cur_n, cur_e, cur_tvd = 0.0, 0.0, 0.0
+    prev_md, prev_inc, prev_azi = 0.0, 0.0, 0.0
+    for m, i, a in zip(md, inc, azi):
+        d_n, d_e, d_tvd, d_dls = minimum_curvature(prev_md, prev_inc, prev_azi, m, i, a)
+        cur_n += d_n
+        cur_e += d_e
+        cur_tvd += d_tvd
+        tvd.append(cur_tvd)
+        north.append(cur_n)
+        east.append(cur_e)
+        dls.append(d_dls)
+        prev_md, prev_inc, prev_azi = m, i, a
+    return tvd, north, east, dls
+
+class ComputeTrajectoryTests(SimpleTestCase):
+    def assertMatchesScalar(self, md, inc, azi):
+        md, inc, azi = (np.array(v, dtype=float) for v in (md, inc, azi))
+        for got, expected in zip(compute_trajectory(md, inc, azi), scalar_trajectory(md, inc, azi)):
+            np.testing.assert_allclose(got, expected, rtol=1e-9, atol=1e-9)
+
+    def test_first_station_at_surface(self):
+        self.assertMatchesScalar([0, 100, 200, 300], [0, 0, 5, 10], [0, 0, 45, 60])
+        tvd, north, east, dls = compute_trajectory(np.array([0.0, 100.0]), np.array([0.0, 0.0]), np.array([0.0, 0.0]))
+        self.assertEqual((tvd[0], north[0], east[0], dls[0]), (0.0, 0.0, 0.0, 0.0))
+
+    def test_first_station_below_surface(self):
+        self.assertMatchesScalar([150, 250, 400], [2, 4, 8], [10, 20, 30])
+
+    def test_straight_segments(self):
+        # beta = 0: Factor de Ratio = 1 (sin división por cero)
+        self.assertMatchesScalar([0, 100, 250], [30, 30, 30], [90, 90, 90])
+        tvd, north, east, dls = compute_trajectory(np.array([100.0]), np.array([0.0]), np.array([0.0]))
+        np.testing.assert_allclose([tvd[0], north[0], east[0], dls[0]], [100.0, 0.0, 0.0, 0.0], atol=1e-12)
+
+class GetPathSegmentTests(SimpleTestCase):
+    # Trayectoria lineal: east = md, north = 2 * md, tvd = 3 * md
+    md = np.array([0.0, 10.0, 20.0])
+
+    def segment_md(self, start_md, end_md):
+        e, n, t = get_path_segment(self.md, self.md, 2 * self.md, 3 * self.md, start_md, end_md)
+        np.testing.assert_allclose(n, 2 * e)
+        np.testing.assert_allclose(t, 3 * e)
+        return e.tolist()
+
+    def test_interpolates_both_ends(self):
+        self.assertEqual(self.segment_md(5, 15), [5, 10, 15])
+        self.assertEqual(self.segment_md(12, 18), [12, 18])
+
+    def test_exact_station_bounds(self):
+        self.assertEqual(self.segment_md(0, 20), [0, 10, 20])
+        self.assertEqual(self.segment_md(10, 15), [10, 15])
+
+    def test_range_outside_survey_is_clipped(self):
+        self.assertEqual(self.segment_md(-5, 15), [0, 10, 15])
+        self.assertEqual(self.segment_md(5, 30), [5, 10, 20])
+        self.assertEqual(self.segment_md(25, 30), [])
+
+    def test_degenerate_ranges_are_not_drawn(self):
+        self.assertEqual(self.segment_md(15, 15), [15])
+        self.assertEqual(self.segment_md(10, 10), [10])
+        self.assertEqual(self.segment_md(15, 5), [15])
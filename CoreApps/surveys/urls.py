@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import WellListView, WellDetailView, SurveyImportView, DownloadTemplateView
+from .views import WellListView, WellDetailView, SurveyImportView, SurveyImportStatusView, DownloadTemplateView
 from .delete_view import TrajectoryDeleteView
 
 app_name = 'surveys'
@@ -8,6 +8,7 @@ urlpatterns = [
     path('wells/', WellListView.as_view(), name='well_list'),
     path('wells/<uuid:pk>/', WellDetailView.as_view(), name='well_detail'),
     path('wells/<uuid:pk>/import/', SurveyImportView.as_view(), name='survey_import'),
+    path('imports/<int:pk>/status/', SurveyImportStatusView.as_view(), name='survey_import_status'),
     path('template/download/', DownloadTemplateView.as_view(), name='download_template'),
     path('trajectory/<int:pk>/delete/', TrajectoryDeleteView.as_view(), name='trajectory_delete'),
 ]
@@ -1,7 +1,9 @@
 import pandas as pd
 import numpy as np
-from math import radians, sin, cos, acos, sqrt, degrees, atan2, pi
+from math import radians, sin, cos, tan, acos, sqrt, degrees, atan2, pi
+from django.db import transaction
 from .models import Well, SurveyImport, Trajectory, TrajectoryStation, BoreholeGeometry
+from .visualizer import build_render_data
 
 def minimum_curvature(md1, inc1, azi1, md2, inc2, azi2):
     """
@@ -28,7 +30,7 @@ def minimum_curvature(md1, inc1, azi1, md2, inc2, azi2):
     if beta < 0.0001: # Segmento recto (o muy pequeño)
         rf = 1
     else:
-        rf = 2 / beta * (np.tan(beta / 2))
+        rf = 2 / beta * tan(beta / 2)
         
     # Desplazamientos
     delta_north = (delta_md / 2) * (sin(i1) * cos(a1) + sin(i2) * cos(a2)) * rf
@@ -43,6 +45,55 @@ def minimum_curvature(md1, inc1, azi1, md2, inc2, azi2):
 
     return delta_north, delta_east, delta_tvd, dls
 
+def compute_trajectory(md, inc, azi):
+    """
+    Versión vectorizada de Curvatura Mínima para un survey completo.
+    Recibe arrays de MD, Inc y Azi (grados) ordenados por MD y retorna
+    arrays acumulados de tvd, norte, este y dls (uno por estación).
+    El origen (0, 0, 0) en superficie actúa como punto de amarre (Tie-In).
+    """
+    # Anteponer el origen en superficie; si la primera estación ya está en MD=0
+    # su delta es nulo y queda en (0, 0, 0) con DLS=0.
+    md = np.concatenate(([0.0], md))
+    i = np.radians(np.concatenate(([0.0], inc)))
+    a = np.radians(np.concatenate(([0.0], azi)))
+    
+    delta_md = np.diff(md)
+    i1, i2 = i[:-1], i[1:]
+    a1, a2 = a[:-1], a[1:]
+    
+    # Dogleg Angle (beta), protegido contra errores numéricos
+    cos_beta = np.cos(i2 - i1) - (np.sin(i1) * np.sin(i2) * (1 - np.cos(a2 - a1)))
+    np.clip(cos_beta, -1, 1, out=cos_beta)
+    beta = np.arccos(cos_beta)
+    
+    # Factor de Ratio (RF): 1 para segmentos rectos (o muy pequeños)
+    straight = beta < 0.0001
+    safe_beta = np.where(straight, 1.0, beta)
+    rf = np.where(straight, 1.0, 2 / safe_beta * np.tan(safe_beta / 2))
+    
+    half_md = (delta_md / 2) * rf
+    delta_north = half_md * (np.sin(i1) * np.cos(a1) + np.sin(i2) * np.cos(a2))
+    delta_east = half_md * (np.sin(i1) * np.sin(a1) + np.sin(i2) * np.sin(a2))
+    delta_tvd = half_md * (np.cos(i1) + np.cos(i2))
+    
+    # Dogleg Severity en deg/30m
+    safe_md = np.where(delta_md == 0, 1.0, delta_md)
+    dls = np.where(delta_md == 0, 0.0, np.degrees(beta) * 30 / safe_md)
+    
+    return np.cumsum(delta_tvd), np.cumsum(delta_north), np.cumsum(delta_east), dls
+
+def open_workbook(file_path):
+    """
+    Abre el Excel una sola vez. Usa el motor calamine (Rust, mucho más rápido)
+    si está instalado; si no, openpyxl (pandas ya lo abre en modo read_only).
+    """
+    try:
+        return pd.ExcelFile(file_path, engine='calamine')
+    except (ImportError, ValueError):
+        # ImportError: falta python-calamine / ValueError: pandas < 2.2 no conoce el motor
+        return pd.ExcelFile(file_path, engine='openpyxl')
+
 def process_survey_file(survey_import, file_path):
     """
     Procesa el archivo Excel cargado.
@@ -53,102 +104,115 @@ def process_survey_file(survey_import, file_path):
     import_log = []
     
     try:
-        xls = pd.ExcelFile(file_path)
+        xls = open_workbook(file_path)
+        # Leer todas las hojas necesarias en una sola pasada sobre el workbook
+        sheets = pd.read_excel(xls, sheet_name=[name for name in ('Survey', 'Mechanical') if name in xls.sheet_names])
         
-        # --- 1. Crear Trayectoria ---
-        trajectory = Trajectory.objects.create(
-            well=survey_import.well,
-            source_import=survey_import,
-            name=f"Importado {survey_import.created_at.strftime('%d/%m %H:%M')}",
-            trajectory_type=Trajectory.Type.REAL
-        )
-        import_log.append("Trayectoria creada.")
+        # Todas las escrituras en una sola transacción: si algo falla no quedan trayectorias huérfanas
+        with transaction.atomic():
+            # --- 1. Crear Trayectoria ---
+            trajectory = Trajectory.objects.create(
+                well=survey_import.well,
+                source_import=survey_import,
+                name=f"Importado {survey_import.created_at.strftime('%d/%m %H:%M')}",
+                trajectory_type=Trajectory.Type.REAL
+            )
+            import_log.append("Trayectoria creada.")
 
-        # --- 2. Procesar Datos de Survey ---
-        if 'Survey' not in xls.sheet_names:
-            raise ValueError("Falta la hoja 'Survey' en el archivo.")
+            # --- 2. Procesar Datos de Survey ---
+            if 'Survey' not in xls.sheet_names:
+                raise ValueError("Falta la hoja 'Survey' en el archivo.")
             
-        df_survey = pd.read_excel(xls, 'Survey')
-        required_cols = ['MD', 'Inc', 'Azi']
-        if not all(col in df_survey.columns for col in required_cols):
-            raise ValueError(f"La hoja Survey debe tener columnas: {required_cols}")
+            df_survey = sheets['Survey']
+            required_cols = ['MD', 'Inc', 'Azi']
+            if not all(col in df_survey.columns for col in required_cols):
+                raise ValueError(f"La hoja Survey debe tener columnas: {required_cols}")
 
-        df_survey = df_survey.sort_values('MD')
+            # mergesort (estable, adaptativo): casi lineal porque el MD ya viene ordenado de adquisición.
+            # MD duplicados darían segmentos de longitud cero: conservar la primera lectura.
+            total_rows = len(df_survey)
+            df_survey = df_survey.sort_values('MD', kind='mergesort').drop_duplicates(subset='MD', keep='first').reset_index(drop=True)
+            if len(df_survey) < total_rows:
+                import_log.append(f"Descartadas {total_rows - len(df_survey)} estaciones con MD duplicado.")
         
-        # Inicializar cálculos
-        current_n, current_e, current_tvd = 0.0, 0.0, 0.0
-        prev_md, prev_inc, prev_azi = 0.0, 0.0, 0.0 
+            # Cálculo vectorizado de Curvatura Mínima sobre todo el survey
+            md_arr = df_survey['MD'].to_numpy(dtype=float)
+            inc_arr = df_survey['Inc'].to_numpy(dtype=float)
+            azi_arr = df_survey['Azi'].to_numpy(dtype=float)
         
-        # Si hay Tie-In en Header, leerlo aquí (simplificado a 0 por ahora)
+            # Si hay Tie-In en Header, leerlo aquí (simplificado a 0 por ahora)
+            tvd_arr, north_arr, east_arr, dls_arr = compute_trajectory(md_arr, inc_arr, azi_arr)
         
-        stations_to_create = []
+            md_list, tvd_list = md_arr.tolist(), tvd_arr.tolist()
+            north_list, east_list = north_arr.tolist(), east_arr.tolist()
         
-        for index, row in df_survey.iterrows():
-            md = float(row['MD'])
-            inc = float(row['Inc'])
-            azi = float(row['Azi'])
+            stations_to_create = [
+                TrajectoryStation(
+                    trajectory=trajectory,
+                    md=md, inclination=inc, azimuth=azi,
+                    tvd=tvd, north=north, east=east, dls=dls
+                )
+                for md, inc, azi, tvd, north, east, dls in zip(
+                    md_list, inc_arr.tolist(), azi_arr.tolist(),
+                    tvd_list, north_list, east_list, dls_arr.tolist()
+                )
+            ]
             
-            if index == 0 and md == 0:
-                # Tie-in point en superficie
-                d_n, d_e, d_tvd, dls = 0, 0, 0, 0
-            else:
-                d_n, d_e, d_tvd, dls = minimum_curvature(prev_md, prev_inc, prev_azi, md, inc, azi)
-                current_n += d_n
-                current_e += d_e
-                current_tvd += d_tvd
+            TrajectoryStation.objects.bulk_create(stations_to_create, batch_size=1000)
             
-            stations_to_create.append(TrajectoryStation(
-                trajectory=trajectory,
-                md=md, inclination=inc, azimuth=azi,
-                tvd=current_tvd, north=current_n, east=current_e, dls=dls
-            ))
-            
-            prev_md, prev_inc, prev_azi = md, inc, azi
-            
-        TrajectoryStation.objects.bulk_create(stations_to_create)
-        import_log.append(f"Procesados {len(stations_to_create)} puntos de survey.")
+            # Copia en arrays para la visualización (ver Trajectory.computed_arrays)
+            trajectory.computed_arrays = {'md': md_list, 'tvd': tvd_list, 'north': north_list, 'east': east_list}
+            import_log.append(f"Procesados {len(stations_to_create)} puntos de survey.")
 
-        # --- 3. Procesar Mecánica (Opcional) ---
-        if 'Mechanical' in xls.sheet_names:
-            df_mech = pd.read_excel(xls, 'Mechanical')
-            mech_cols = ['Item', 'Top_MD', 'Bottom_MD', 'Diameter', 'Color']
+            # --- 3. Procesar Mecánica (Opcional) ---
+            geometries = []
+            if 'Mechanical' in sheets:
+                df_mech = sheets['Mechanical']
+                mech_cols = ['Item', 'Top_MD', 'Bottom_MD', 'Diameter', 'Color']
             
-            if all(col in df_mech.columns for col in mech_cols):
-                geometries = []
-                for _, row in df_mech.iterrows():
-                    # Validación y Sanitización de Diametro
-                    raw_diameter = row['Diameter']
-                    try:
-                        # Manejar casos donde llega como string con coma (ej: "9,625")
-                        if isinstance(raw_diameter, str):
-                            raw_diameter = raw_diameter.replace(',', '.')
+                if all(col in df_mech.columns for col in mech_cols):
+                    for item, top_md, bottom_md, raw_diameter, color in df_mech[mech_cols].itertuples(index=False, name=None):
+                        # Validación y Sanitización de Diametro
+                        try:
+                            # Manejar casos donde llega como string con coma (ej: "9,625")
+                            if isinstance(raw_diameter, str):
+                                raw_diameter = raw_diameter.replace(',', '.')
                         
-                        diameter_val = float(raw_diameter)
+                            diameter_val = float(raw_diameter)
                         
-                        # Heurística: Si el diámetro es > 100 pulgadas (ej: 9625), asumir error de escala/formato y corregir
-                        # Tuberías reales de pozo raramente exceden 36-40 pulgadas.
-                        if diameter_val > 100:
-                            diameter_val = diameter_val / 1000.0
+                            # Heurística: Si el diámetro es > 100 pulgadas (ej: 9625), asumir error de escala/formato y corregir
+                            # Tuberías reales de pozo raramente exceden 36-40 pulgadas.
+                            if diameter_val > 100:
+                                diameter_val = diameter_val / 1000.0
                             
-                    except (ValueError, TypeError):
-                        diameter_val = 8.5 # Valor fallback seguro
+                        except (ValueError, TypeError):
+                            diameter_val = 8.5 # Valor fallback seguro
                         
-                    geometries.append(BoreholeGeometry(
-                        trajectory=trajectory,
-                        item_type=row['Item'],
-                        start_md=row['Top_MD'],
-                        end_md=row['Bottom_MD'],
-                        diameter=diameter_val,
-                        color=str(row['Color'])
-                    ))
-                BoreholeGeometry.objects.bulk_create(geometries)
-                import_log.append(f"Cargados {len(geometries)} elementos mecánicos.")
-            else:
-                import_log.append("Hoja Mechanical ignorada: Faltan columnas.")
+                        geometries.append(BoreholeGeometry(
+                            trajectory=trajectory,
+                            item_type=item,
+                            start_md=top_md,
+                            end_md=bottom_md,
+                            diameter=diameter_val,
+                            color=str(color)
+                        ))
+                    BoreholeGeometry.objects.bulk_create(geometries, batch_size=500)
+                    import_log.append(f"Cargados {len(geometries)} elementos mecánicos.")
+                else:
+                    import_log.append("Hoja Mechanical ignorada: Faltan columnas.")
 
-        survey_import.status = SurveyImport.Status.PROCESSED
-        survey_import.processing_log = "\n".join(import_log)
-        survey_import.save()
+            # --- 4. Precalcular mallas 3D (la trayectoria no cambia tras la importación) ---
+            geometry_rows = sorted(
+                ((g.item_type, g.start_md, g.end_md, g.diameter, g.color) for g in geometries),
+                key=lambda g: g[1]
+            )
+            if md_list:
+                trajectory.render_cache = build_render_data(trajectory.computed_arrays, geometry_rows)
+            trajectory.save(update_fields=['computed_arrays', 'render_cache'])
+
+            survey_import.status = SurveyImport.Status.PROCESSED
+            survey_import.processing_log = "\n".join(import_log)
+            survey_import.save()
         return True
 
     except Exception as e:
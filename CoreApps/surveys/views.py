@@ -3,10 +3,11 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.views.generic import ListView, DetailView, CreateView, View
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.urls import reverse_lazy, reverse
-from django.http import HttpResponse, FileResponse
+from django.http import HttpResponse, FileResponse, JsonResponse
 from django.conf import settings
-from .models import Well, SurveyImport
-from .utils import process_survey_file
+from django.db.models import Prefetch
+from .models import Well, SurveyImport, Trajectory
+from .tasks import process_survey_file_task
 from .visualizer import generate_3d_plot
 
 class WellListView(LoginRequiredMixin, ListView):
@@ -19,17 +20,29 @@ class WellDetailView(LoginRequiredMixin, DetailView):
     template_name = 'surveys/well_detail.html'
     context_object_name = 'well'
 
+    def get_queryset(self):
+        # Precargar la trayectoria activa (la primera por pk, como .first()).
+        # Las estaciones vienen en computed_arrays; render_cache (pesado) solo se lee
+        # si el HTML del gráfico no está en caché.
+        active_trajectories = Trajectory.objects.filter(is_active=True).order_by('pk').defer('render_cache')
+        return super().get_queryset().prefetch_related(
+            Prefetch('trajectories', queryset=active_trajectories, to_attr='active_trajectories')
+        )
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         # Traer importaciones recientes
-        context['recent_imports'] = self.object.imports.all().order_by('-created_at')[:5]
+        context['recent_imports'] = self.object.imports.select_related('uploaded_by').order_by('-created_at')[:5]
         
-        # Traer trayectoria activa
-        active_traj = self.object.trajectories.filter(is_active=True).first()
+        # Trayectoria activa (precargada en get_queryset)
+        active_traj = self.object.active_trajectories[0] if self.object.active_trajectories else None
         context['active_trajectory'] = active_traj
         
         # Generar Gráfico 3D si hay trayectoria
         if active_traj:
+            arrays = active_traj.get_station_arrays()
+            if arrays['md']:
+                context['last_station'] = {'md': arrays['md'][-1], 'tvd': arrays['tvd'][-1]}
             context['plot_div'] = generate_3d_plot(active_traj)
             
         return context
@@ -48,18 +61,19 @@ class SurveyImportView(LoginRequiredMixin, View):
                 status=SurveyImport.Status.PENDING
             )
             
-            # Procesar archivo (Idealmente esto va a una cola Celery, pero MVP inline)
-            success = process_survey_file(survey_import, survey_import.excel_file.path)
-            
-            if success:
-                # Marcar trayectoria como activa si es la única
-                trajectory = survey_import.generated_trajectories.first()
-                if trajectory:
-                    trajectory.is_active = True
-                    trajectory.save()
+            # Procesar archivo en segundo plano (Celery); la vista consulta el estado por AJAX
+            process_survey_file_task.delay(survey_import.id)
 
         return redirect('surveys:well_detail', pk=pk)
 
+class SurveyImportStatusView(LoginRequiredMixin, View):
+    def get(self, request, pk):
+        survey_import = get_object_or_404(SurveyImport.objects.only('status', 'processing_log'), pk=pk)
+        return JsonResponse({
+            'status': survey_import.status,
+            'processing_log': survey_import.processing_log,
+        })
+
 class DownloadTemplateView(LoginRequiredMixin, View):
     def get(self, request):
         # Ruta al archivo estático (que crearemos en el paso de static)
@@ -1,147 +1,192 @@
 import numpy as np
 import plotly.graph_objects as go
-from plotly import offline
+import plotly.io as pio
+from django.core.cache import cache
 from .models import Trajectory
 
-def generate_3d_plot(trajectory):
+# La trayectoria no cambia tras la importación: el HTML se reutiliza entre visitas
+PLOT_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Constantes de Visualización
+# Factor ajustado a 50.0 para balancear visibilidad y realismo (similar al script original)
+VISUAL_EXAGGERATION_FACTOR = 50.0
+
+# Malla radial de los cilindros (se calcula una sola vez al importar el módulo)
+RADIAL_RESOLUTION = 20
+THIN_RADIAL_RESOLUTION = 12   # Tubing y elementos delgados: menos caras, misma apariencia
+THIN_ITEM_DIAMETER = 5.0      # Pulgadas
+# Máximo de puntos a lo largo del eje por cilindro (limita el tamaño del JSON enviado al navegador)
+MAX_CYLINDER_SAMPLES = 200
+
+def _radial_table(resolution):
+    theta = np.linspace(0, 2*np.pi, resolution)
+    return np.cos(theta), np.sin(theta)
+
+_RADIAL_TABLES = {n: _radial_table(n) for n in (RADIAL_RESOLUTION, THIN_RADIAL_RESOLUTION)}
+
+def plot_cache_key(trajectory):
     """
-    Genera un gráfico 3D interactivo del pozo usando Plotly.
-    Adapta la lógica de cilindros para dar volumen al pozo según su geometría.
-    Retorna un string HTML (div) listo para incrustar.
+    Clave de caché del gráfico 3D. Incluye created_at para no reutilizar
+    el HTML de una trayectoria borrada si su id se vuelve a asignar.
+    """
+    return f"plot3d:{trajectory.pk}:{trajectory.created_at.timestamp()}"
+
+def create_3d_cylinder(x, y, z, r, color_vals, name, resolution=RADIAL_RESOLUTION):
+    """
+    Construye la malla de un tubo alrededor del eje (x, y, z) con radio r.
+    Retorna un dict serializable (listas) para guardarlo en Trajectory.render_cache.
+    """
+    cos_t, sin_t = _RADIAL_TABLES[resolution]
+    
+    # Submuestrear trayectorias largas (conserva el primer y último punto)
+    if len(x) > MAX_CYLINDER_SAMPLES:
+        idx = np.linspace(0, len(x) - 1, MAX_CYLINDER_SAMPLES).astype(int)
+        x, y, z, color_vals = x[idx], y[idx], z[idx], color_vals[idx]
+    
+    # Broadcasting (N, 1) + (1, resolution) -> (N, resolution)
+    x_grid = x[:, None] + r * cos_t[None, :]
+    y_grid = y[:, None] + r * sin_t[None, :]
+    color_grid = np.tile(color_vals, (resolution, 1)).T
+    
+    # Redondeo a mm: suficiente para la vista y reduce el tamaño del JSON.
+    # z se guarda 1D (constante en cada anillo); se expande a 2D al armar la figura.
+    return {
+        'kind': 'cylinder',
+        'name': name,
+        'text': f"{name} (OD: {r/VISUAL_EXAGGERATION_FACTOR*12*2:.3f}\")",
+        'x': np.round(x_grid, 3).tolist(),
+        'y': np.round(y_grid, 3).tolist(),
+        'z': np.round(z, 3).tolist(),
+        'surfacecolor': np.round(color_grid, 3).tolist(),
+    }
+
+def get_path_segment(md_arr, east_arr, north_arr, tvd_arr, start_md, end_md):
+    """
+    Retorna arrays (e, n, t) para el rango solicitado,
+    interpolando los puntos extremos para que el tubo cubra exactamente el rango.
     """
-    stations = trajectory.stations.all().order_by('md')
-    geometry = trajectory.geometry.all().order_by('start_md')
+    # 1. Índices de los puntos dentro del rango (md_arr está ordenado)
+    lo = np.searchsorted(md_arr, start_md, side='left')
+    hi = np.searchsorted(md_arr, end_md, side='right')
+    
+    # 2. Extremos a interpolar: solo si caen dentro del survey y no coinciden con una estación.
+    # Rangos degenerados (end_md <= start_md) no agregan el final: quedan con < 2 puntos y no se dibujan.
+    add_start = md_arr[0] < start_md < md_arr[-1] and md_arr[lo] != start_md
+    add_end = (end_md > start_md and (hi > lo or add_start)
+               and md_arr[0] < end_md < md_arr[-1] and md_arr[hi - 1] != end_md)
+    start_pts = [start_md] if add_start else []
+    end_pts = [end_md] if add_end else []
     
-    if not stations.exists():
-        return "<div class='text-center text-slate-500 py-10'>Sin datos de survey para visualizar.</div>"
+    # 3. Inicio interpolado + puntos intermedios existentes + final interpolado
+    def segment(values):
+        return np.concatenate((
+            np.interp(start_pts, md_arr, values),
+            values[lo:hi],
+            np.interp(end_pts, md_arr, values),
+        ))
+    
+    return segment(east_arr), segment(north_arr), segment(tvd_arr)
 
-    # Extraer coordinadas
+def build_render_data(arrays, geometry):
+    """
+    Precalcula las mallas 3D de la trayectoria (se ejecuta una vez en la importación).
+    arrays: dict de Trajectory.get_station_arrays().
+    geometry: tuplas (item_type, start_md, end_md, diameter, color) ordenadas por start_md.
+    Retorna {'traces': [...]} (cilindros y entradas de leyenda, en orden de dibujo)
+    listo para guardar en Trajectory.render_cache.
+    """
     # Nota: Plotly usa coordenadas (X, Y, Z). 
     # En petróleo: X=Este, Y=Norte, Z=TVD (Invertido).
+    md_arr, tvd_arr, north_arr, east_arr = (np.asarray(arrays[field], dtype=float) for field in Trajectory.STATION_ARRAY_FIELDS)
     
-    # Convertir a numpy arrays para velocidad
-    md_arr = np.array([s.md for s in stations])
-    tvd_arr = np.array([s.tvd for s in stations])
-    north_arr = np.array([s.north for s in stations])
-    east_arr = np.array([s.east for s in stations])
+    traces = []
     
-    fig = go.Figure()
-
-    # Constantes de Visualización
-    # Factor ajustado a 50.0 para balancear visibilidad y realismo (similar al script original)
-    VISUAL_EXAGGERATION_FACTOR = 50.0  
-    RADIAL_RESOLUTION = 20
-
-    def create_3d_cylinder(x, y, z, r, color_vals, name):
-        theta = np.linspace(0, 2*np.pi, RADIAL_RESOLUTION)
-        theta_grid, z_grid = np.meshgrid(theta, z)
-        x_grid = np.array([xi + r * np.cos(theta) for xi in x])
-        y_grid = np.array([yi + r * np.sin(theta) for yi in y])
-        color_grid = np.tile(color_vals, (RADIAL_RESOLUTION, 1)).T
-        
-        return go.Surface(
-            x=x_grid, y=y_grid, z=z_grid,
-            surfacecolor=color_grid,
-            colorscale='Turbo',
-            name=name,
-            showscale=False,
-            opacity=1.0, 
-            # Iluminación ajustada para resaltar volumen cilíndrico
-            lighting=dict(ambient=0.3, diffuse=0.9, roughness=0.1, specular=1.0, fresnel=0.5),
-            hoverinfo="text",
-            text=f"{name} (OD: {r/VISUAL_EXAGGERATION_FACTOR*12*2:.3f}\")", 
-            showlegend=True 
-        )
-
-    # --- HELPER: Interpolación para segmentos exactos ---
-    def get_path_segment(start_md, end_md):
-        """
-        Retorna arrays (e, n, t, r) para el rango solicitado,
-        interpolando los puntos extremos para que el tubo cubra exactamente el rango.
-        """
-        # 1. Encontrar índices base
-        # Puntos dentro del rango estricto
-        mask_d = (md_arr >= start_md) & (md_arr <= end_md)
-        e_seg = east_arr[mask_d]
-        n_seg = north_arr[mask_d]
-        t_seg = tvd_arr[mask_d]
-        m_seg = md_arr[mask_d]
-        
-        # Lista para construir el segmento final
-        final_e, final_n, final_t, final_m = [], [], [], []
-        
-        # 2. Interpolación del punto INICIAL (si start_md no coincide con el primer punto)
-        if len(m_seg) == 0 or m_seg[0] > start_md:
-            # Encontrar el índice anterior a start_md
-            idx_prev = np.searchsorted(md_arr, start_md) - 1
-            if idx_prev >= 0 and idx_prev < len(md_arr) - 1:
-                # Interpolamos entre idx_prev y idx_prev+1
-                m0, m1 = md_arr[idx_prev], md_arr[idx_prev+1]
-                factor = (start_md - m0) / (m1 - m0) if m1 > m0 else 0
-                
-                final_e.append(east_arr[idx_prev] + (east_arr[idx_prev+1] - east_arr[idx_prev]) * factor)
-                final_n.append(north_arr[idx_prev] + (north_arr[idx_prev+1] - north_arr[idx_prev]) * factor)
-                final_t.append(tvd_arr[idx_prev] + (tvd_arr[idx_prev+1] - tvd_arr[idx_prev]) * factor)
-                final_m.append(start_md)
-        
-        # 3. Agregar puntos intermedios existentes
-        final_e.extend(e_seg)
-        final_n.extend(n_seg)
-        final_t.extend(t_seg)
-        final_m.extend(m_seg)
-        
-        # 4. Interpolación del punto FINAL (si end_md no coincide con el último punto)
-        if len(final_m) > 0 and final_m[-1] < end_md:
-             idx_prev = np.searchsorted(md_arr, end_md) - 1
-             if idx_prev >= 0 and idx_prev < len(md_arr) - 1:
-                m0, m1 = md_arr[idx_prev], md_arr[idx_prev+1]
-                factor = (end_md - m0) / (m1 - m0) if m1 > m0 else 0
-                
-                final_e.append(east_arr[idx_prev] + (east_arr[idx_prev+1] - east_arr[idx_prev]) * factor)
-                final_n.append(north_arr[idx_prev] + (north_arr[idx_prev+1] - north_arr[idx_prev]) * factor)
-                final_t.append(tvd_arr[idx_prev] + (tvd_arr[idx_prev+1] - tvd_arr[idx_prev]) * factor)
-                final_m.append(end_md)
-        
-        return np.array(final_e), np.array(final_n), np.array(final_t)
-
     # Si no hay geometría, cilindro único
-    if not geometry.exists():
+    if not geometry:
         r_viz = ((8.5/2)/12) * VISUAL_EXAGGERATION_FACTOR
-        cyl = create_3d_cylinder(east_arr, north_arr, tvd_arr, r_viz, tvd_arr, "Open Hole")
-        fig.add_trace(cyl)
-        fig.add_trace(go.Scatter3d(x=[None], y=[None], z=[None], mode='markers', name='Open Hole 8.5"', marker=dict(size=15, color='#1f77b4', symbol='square')))
+        traces.append(create_3d_cylinder(east_arr, north_arr, tvd_arr, r_viz, tvd_arr, "Open Hole"))
+        traces.append({'kind': 'legend', 'name': 'Open Hole 8.5"', 'color': '#1f77b4', 'size': 15})
+        return {'traces': traces}
+
+    # Lógica "Telescópica" (Layering)
+    # Dibujamos CADA elemento independientemente. 
+    # Los tubos más anchos (Casings superficiales) cubrirán a los internos si se superponen.
+    # Esto replica exactamente el comportamiento del script de Python del usuario.
     
-    else:
-        # Lógica "Telescópica" (Layering)
-        # Dibujamos CADA elemento independientemente. 
-        # Los tubos más anchos (Casings superficiales) cubrirán a los internos si se superponen.
-        # Esto replica exactamente el comportamiento del script de Python del usuario.
-        
-        legend_items = set()
+    legend_items = set()
 
-        for item in geometry:
-            # Obtener segmento interpolado exacto para este item
-            s_e, s_n, s_t = get_path_segment(item.start_md, item.end_md)
+    for item_type, start_md, end_md, diameter, color in geometry:
+        # Obtener segmento interpolado exacto para este item
+        s_e, s_n, s_t = get_path_segment(md_arr, east_arr, north_arr, tvd_arr, float(start_md), float(end_md))
+        
+        if len(s_e) > 1:
+            radius_ft = (diameter / 2) / 12
+            r_viz = radius_ft * VISUAL_EXAGGERATION_FACTOR
             
-            if len(s_e) > 1:
-                radius_ft = (item.diameter / 2) / 12
-                r_viz = radius_ft * VISUAL_EXAGGERATION_FACTOR
-                
-                # Nombre para hover
-                label = f"{item.item_type} ({item.diameter}\")"
-                
-                # Crear cilindro
-                cyl = create_3d_cylinder(s_e, s_n, s_t, r_viz, s_t, label)
-                fig.add_trace(cyl)
-                
-                # Agregar a leyenda (evitando duplicados)
-                if label not in legend_items:
-                    fig.add_trace(go.Scatter3d(
-                        x=[None], y=[None], z=[None], mode='markers', 
-                        name=label, 
-                        marker=dict(size=12, color=item.color if item.color else 'blue', symbol='square')
-                    ))
-                    legend_items.add(label)
+            # Nombre para hover
+            label = f"{item_type} ({diameter}\")"
+            
+            # Crear cilindro
+            resolution = THIN_RADIAL_RESOLUTION if diameter < THIN_ITEM_DIAMETER else RADIAL_RESOLUTION
+            traces.append(create_3d_cylinder(s_e, s_n, s_t, r_viz, s_t, label, resolution))
+            
+            # Agregar a leyenda (evitando duplicados)
+            if label not in legend_items:
+                traces.append({'kind': 'legend', 'name': label, 'color': color if color else 'blue', 'size': 12})
+                legend_items.add(label)
+
+    return {'traces': traces}
+
+def generate_3d_plot(trajectory):
+    """
+    Genera un gráfico 3D interactivo del pozo usando Plotly.
+    Adapta la lógica de cilindros para dar volumen al pozo según su geometría.
+    Retorna un string HTML (div) listo para incrustar (cacheado por trayectoria).
+    """
+    cache_key = plot_cache_key(trajectory)
+    html = cache.get(cache_key)
+    if html is not None:
+        return html
+
+    # Mallas precalculadas en la importación (Trajectory.render_cache)
+    render_data = trajectory.render_cache
+    if not render_data:
+        # Trayectorias importadas antes del precálculo o editadas desde el admin
+        arrays = trajectory.get_station_arrays()
+        if not arrays['md']:
+            return "<div class='text-center text-slate-500 py-10'>Sin datos de survey para visualizar.</div>"
+        
+        geometry = list(trajectory.geometry.order_by('start_md').values_list('item_type', 'start_md', 'end_md', 'diameter', 'color'))
+        render_data = build_render_data(arrays, geometry)
+        # Persistir para las próximas visitas
+        Trajectory.objects.filter(pk=trajectory.pk).update(render_cache=render_data)
+        trajectory.render_cache = render_data
+    
+    fig = go.Figure()
+
+    for trace in render_data['traces']:
+        if trace['kind'] == 'cylinder':
+            fig.add_trace(go.Surface(
+                x=trace['x'], y=trace['y'],
+                # Plotly exige z 2D: vista (N, resolution) sin copiar el array
+                z=np.broadcast_to(np.asarray(trace['z'])[:, None], np.shape(trace['x'])),
+                surfacecolor=trace['surfacecolor'],
+                colorscale='Turbo',
+                name=trace['name'],
+                showscale=False,
+                opacity=1.0, 
+                # Iluminación ajustada para resaltar volumen cilíndrico
+                lighting=dict(ambient=0.3, diffuse=0.9, roughness=0.1, specular=1.0, fresnel=0.5),
+                hoverinfo="text",
+                text=trace['text'], 
+                showlegend=True 
+            ))
+        else:
+            fig.add_trace(go.Scatter3d(
+                x=[None], y=[None], z=[None], mode='markers', 
+                name=trace['name'], 
+                marker=dict(size=trace['size'], color=trace['color'], symbol='square')
+            ))
 
     # Configuración de Escena DARK MODE
     fig.update_layout(
@@ -171,4 +216,7 @@ def generate_3d_plot(trajectory):
     )
 
     # Retornar div HTML (incluyendo JS por si acaso, o manejarlo externo)
-    return offline.plot(fig, output_type='div', include_plotlyjs='cdn')
+    # La figura ya se validó al construir cada traza: omitir la validación final al serializar
+    html = pio.to_html(fig, include_plotlyjs='cdn', full_html=False, validate=False)
+    cache.set(cache_key, html, PLOT_CACHE_TIMEOUT)
+    return html
@@ -0,0 +1,15 @@
+"""
+Celery config for survey project.
+
+Worker: celery -A survey worker -l info
+"""
+
+import os
+
+from celery import Celery
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'survey.settings')
+
+app = Celery('survey')
+app.config_from_object('django.conf:settings', namespace='CELERY')
+app.autodiscover_tasks()